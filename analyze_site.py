@@ -1,16 +1,133 @@
 import sys
+import asyncio
 import json
 import llm
 import logging
 import os
+import hashlib
+import functools
+import re
+import contextlib
+import aiohttp
 from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright
+from azure.core.pipeline.transport import AioHttpTransport
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-BASE_URL = sys.argv[1]
 SEARCH_TEST_QUERY = "test"
+SITES_DIR = "sites"
+# Upper bound on sites with an open browser context at the same time
+MAX_CONCURRENT_SITES = 4
+# Common containers that signal search results have rendered
+SEARCH_RESULTS_SELECTOR = ".results, .search-results, #search-results, [data-testid*=result]"
+SEARCH_RESULTS_TIMEOUT = 10000
+# Requests that never change the DOM we analyze, so the browser doesn't fetch them
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "hotjar.com",
+)
+# Keep-alive connections to the GitHub Models endpoint shared by all LLM calls
+LLM_MAX_CONNECTIONS = 8
+HTML_SNIPPET_LENGTH = 3000
+LLM_CACHE_PATH = os.path.join("data", "llm_cache.json")
+# Bump whenever the analysis prompts change so stale cached results are ignored
+PROMPT_VERSION = "4"
+
+# Structured output schema for a single page analysis
+PAGE_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "page_type": {"type": "string"},
+        "actions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": ["form", "button", "link"]},
+                    "purpose": {"type": "string"},
+                    "details": {"type": "string"},
+                },
+                "required": ["type", "purpose", "details"],
+            },
+        },
+        "search_form": {
+            "anyOf": [
+                {
+                    "type": "object",
+                    "properties": {
+                        "action": {"type": "string"},
+                        "params": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["action", "params"],
+                },
+                {"type": "null"},
+            ]
+        },
+    },
+    "required": ["page_type", "actions", "search_form"],
+}
+# Structured outputs need an object at the top level, so batches are wrapped
+BATCH_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {"pages": {"type": "array", "items": PAGE_ANALYSIS_SCHEMA}},
+    "required": ["pages"],
+}
+
+# Analysis instructions shared by the single-page and batched prompts. The prompts
+# are fixed system messages with the page HTML sent separately afterwards, so every
+# request starts with an identical prefix the endpoint can cache.
+PAGE_ANALYSIS_INSTRUCTIONS = """1. Page type (homepage, product page, cart, search results, etc.)
+2. All interactive elements (forms, buttons, links) and their purpose
+3. IMPORTANT: Search functionality - look for:
+   - Input fields with type="search" or names like "search", "query", "q"
+   - Form elements that might be used for searching
+   - Submit buttons associated with search inputs
+
+For search forms, provide:
+- The form's action URL (or current page if no action specified)
+- All relevant input parameter names (especially search-related ones)
+Set search_form to null if no search is found."""
+
+SINGLE_PAGE_PROMPT = f"""You are analyzing a website page. Look carefully for search functionality.
+
+The HTML contains only the page title, main heading and interactive elements
+(forms, inputs, buttons and search links). Analyze it and identify:
+{PAGE_ANALYSIS_INSTRUCTIONS}
+
+Be very thorough in looking for search functionality. Even if it's not obvious, check for any input fields that could be used for search."""
+
+BATCH_PROMPT = f"""You are analyzing several pages from the same website. Each page is delimited by
+<<<PAGE id=N url=...>>> and <<<END>>> markers. Each page's HTML contains only its title, main
+heading and interactive elements. Look carefully for search functionality on each page.
+
+For each page, identify:
+{PAGE_ANALYSIS_INSTRUCTIONS}
+
+Return one entry in "pages" per page, in the same order as the page ids."""
+
+# Markup that carries no signal for page classification, only prompt tokens
+PRUNED_TAGS = ["script", "style", "noscript", "svg", "iframe"]
+KEPT_ATTRIBUTES = {"name", "id", "type", "action", "method", "role", "aria-label", "placeholder", "href"}
+# Elements the LLM actually needs: enough context for the page type, plus everything interactive
+INTERACTIVE_SELECTOR = "title, h1, form, input, button, [role=search], [role=button], a[href*=search]"
 
 def get_safe_filename(url):
     """Convert URL to a safe filename."""
@@ -37,67 +154,191 @@ def get_safe_filename(url):
     
     return f"{filename}.json"
 
-model = llm.get_model("github/gpt-4o")
-results = {
-    "pages": {},
-    "search_detected": False,
-    "search_details": None,
-    "search_test_results": None
-}
+def json_loads(data):
+    """Parse JSON, using orjson when it's available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def read_json_file(path):
+    """Load a JSON file."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json_file(path, data, indent=False):
+    """Write data to a JSON file, optionally indented by two spaces."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2 if indent else None)
+
+def prune_html(html):
+    """Strip scripts, styles and noisy attributes from HTML before sending it to the LLM."""
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(PRUNED_TAGS)
+    for node in tree.css('link[rel="stylesheet"]'):
+        node.decompose()
+    for node in tree.css("*"):
+        for attr in list(node.attrs.keys()):
+            if attr not in KEPT_ATTRIBUTES:
+                del node.attrs[attr]
+    return re.sub(r"\s+", " ", tree.html)
+
+def extract_interactive_html(html):
+    """Reduce HTML to the page title, headings, forms, inputs, buttons and search links.
+
+    Elements nested inside an already extracted element (e.g. inputs inside a
+    form) are not repeated. Falls back to the full HTML if nothing matches.
+    """
+    tree = LexborHTMLParser(html)
+    extracted = set()
+    parts = []
+    for node in tree.css(INTERACTIVE_SELECTOR):
+        # css() yields a node once per selector it matches, so check the node itself too
+        ancestor = node
+        while ancestor is not None and ancestor.mem_id not in extracted:
+            ancestor = ancestor.parent
+        if ancestor is not None:
+            continue
+        extracted.add(node.mem_id)
+        parts.append(node.html)
+    return "\n".join(parts) if parts else html
+
+model = llm.get_async_model("github/gpt-4o")
+
+@contextlib.asynccontextmanager
+async def shared_llm_connections():
+    """Route every LLM request through one keep-alive HTTP session.
+
+    llm-github-models builds a new Azure AI Inference client for each prompt,
+    passing the model's client_kwargs through. Handing it a transport around a
+    session it doesn't own means the session is never closed between prompts,
+    so later requests reuse already established TLS connections.
+
+    client_kwargs is an internal of llm-github-models, which is why it's pinned
+    to 0.17.x in pyproject.toml; check this still holds before bumping it. The
+    transport is set on the shared model object for the duration of the run.
+    """
+    # Same session settings azure-core uses when it creates its own
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=LLM_MAX_CONNECTIONS),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        auto_decompress=False,
+        trust_env=True,
+    ) as session:
+        model.client_kwargs["transport"] = AioHttpTransport(session=session, session_owner=False)
+        try:
+            yield
+        finally:
+            del model.client_kwargs["transport"]
+
 has_errors = False
 
-def analyze_page(url, html):
-    """Send page HTML to LLM to classify and detect operations."""
-    global has_errors
-    
-    prompt = f"""
-You are analyzing a website page. Look carefully for search functionality.
+def load_llm_cache():
+    """Load previously cached LLM analyses from disk."""
+    try:
+        return read_json_file(LLM_CACHE_PATH)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        logging.warning(f"Ignoring unreadable LLM cache {LLM_CACHE_PATH}: {e}")
+        return {}
 
-Analyze this HTML and identify:
-1. Page type (homepage, product page, cart, search results, etc.)
-2. All interactive elements (forms, buttons, links) and their purpose
-3. IMPORTANT: Search functionality - look for:
-   - Input fields with type="search" or names like "search", "query", "q"
-   - Form elements that might be used for searching
-   - Submit buttons associated with search inputs
+def save_llm_cache():
+    """Atomically write the LLM cache back to disk."""
+    os.makedirs(os.path.dirname(LLM_CACHE_PATH), exist_ok=True)
+    tmp_path = LLM_CACHE_PATH + ".tmp"
+    write_json_file(tmp_path, llm_cache)
+    os.replace(tmp_path, LLM_CACHE_PATH)
 
-For search forms, provide:
-- The form's action URL (or current page if no action specified)
-- All relevant input parameter names (especially search-related ones)
+llm_cache = load_llm_cache()
+
+def cache_key(html):
+    """Content-addressed key for the analysis of a page's HTML."""
+    html_snippet = html[:HTML_SNIPPET_LENGTH]
+    return hashlib.blake2b(PROMPT_VERSION.encode() + html_snippet.encode(), digest_size=16).hexdigest()
+
+def cached_analysis(func):
+    """Serve page analyses from the LLM cache, storing successful results on a miss."""
+    @functools.wraps(func)
+    async def wrapper(url, html):
+        key = cache_key(html)
+        if key in llm_cache:
+            logging.info(f"Using cached analysis for: {url}")
+            return llm_cache[key]
+        result = await func(url, html)
+        if "error" not in result:
+            llm_cache[key] = result
+        return result
+    return wrapper
+
+async def read_json_response(resp):
+    """Stream an LLM response and return its first complete JSON object or array.
+
+    Anything around the JSON (markdown fences, trailing prose) is dropped. The
+    rest of the stream is still drained so llm marks the response as done,
+    records usage and releases the HTTP connection. If no complete JSON value
+    arrives, the whole response text is returned.
+    """
+    buffer = ""
+    json_text = None
+    start = None
+    depth = 0
+    in_string = False
+    escaped = False
+    async for chunk in resp:
+        if json_text is not None:
+            continue
+        offset = len(buffer)
+        buffer += chunk
+        for i in range(offset, len(buffer)):
+            char = buffer[i]
+            if start is None:
+                if char in "{[":
+                    start = i
+                    depth = 1
+                continue
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    json_text = buffer[start:i + 1]
+                    break
+    return json_text if json_text is not None else buffer.strip()
+
+async def request_analysis(system_prompt, content, schema):
+    """Send page content to the LLM under a fixed system prompt and return the JSON text of its response."""
+    resp = model.prompt(content, system=system_prompt, schema=schema, stream=True)
+    response_text = await read_json_response(resp)
+    logging.debug(f"LLM response: {response_text}")
+    return response_text
+
+@cached_analysis
+async def analyze_page(url, html):
+    """Send page HTML to LLM to classify and detect operations."""
+    global has_errors
 
-Return ONLY valid JSON with no markdown formatting, code blocks, or explanations.
-
-Required JSON structure:
-{{
-  "page_type": "string",
-  "actions": [
-    {{"type": "form|button|link", "purpose": "description", "details": "additional info"}}
-  ],
-  "search_form": {{
-    "action": "url_or_path",
-    "params": ["param1", "param2"]
-  }} OR null if no search found
-}}
-
-Be very thorough in looking for search functionality. Even if it's not obvious, check for any input fields that could be used for search.
-"""
+    response_text = ""
     try:
         logging.info(f"Analyzing page: {url}")
-        # Send more HTML content for better analysis
-        html_snippet = html[:8000]  # Increased from 5000
-        resp = model.prompt(prompt + "\n\nHTML to analyze:\n" + html_snippet)
-        response_text = resp.text().strip()
-        logging.debug(f"LLM response: {response_text}")
-        
-        # Try to extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            start = response_text.find("```json") + 7
-            end = response_text.find("```", start)
-            if end != -1:
-                response_text = response_text[start:end].strip()
-                logging.debug(f"Extracted JSON from code block: {response_text}")
-        
-        result = json.loads(response_text)
+        html_snippet = html[:HTML_SNIPPET_LENGTH]
+        response_text = await request_analysis(SINGLE_PAGE_PROMPT, "HTML to analyze:\n" + html_snippet, PAGE_ANALYSIS_SCHEMA)
+        result = json_loads(response_text)
         
         # Log the analysis result for debugging
         if result.get("search_form"):
@@ -117,80 +358,268 @@ Be very thorough in looking for search functionality. Even if it's not obvious,
         has_errors = True
         return {"error": f"Failed to analyze page: {str(e)}"}
 
-with sync_playwright() as p:
-    browser = p.chromium.launch()
-    page = browser.new_page()
+async def block_unneeded_requests(route):
+    """Abort media, styling and analytics requests; let everything else through."""
+    request = route.request
+    hostname = urlparse(request.url).hostname or ""
+    blocked_domain = any(hostname == domain or hostname.endswith("." + domain) for domain in BLOCKED_DOMAINS)
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or blocked_domain:
+        await route.abort()
+    else:
+        await route.continue_()
+
+SEARCH_INPUT_SELECTOR = ", ".join([
+    'input[type="search"]',
+    'input[name="q"]',
+    'input[name="query"]',
+    'input[name="search"]',
+    'input[name="s"]',
+    'form[role="search"] input:not([type="hidden"])',
+])
+
+async def detect_search_form_dom(page):
+    """Detect a search input with a DOM query instead of an LLM call.
+
+    Only text-like inputs count, since those are the ones the test search can
+    fill; matches such as a submit button or hidden field named "search" are
+    skipped. Returns a dict shaped like the LLM's "search_form" output, or None.
+    """
+    # el.type reports "text" when the type attribute is missing
+    details = await page.locator(SEARCH_INPUT_SELECTOR).evaluate_all("""inputs => {
+        const input = inputs.find(el => el.name && (el.type === "search" || el.type === "text"));
+        return input ? {name: input.name, action: input.form ? input.form.action : null} : null;
+    }""")
+    if not details:
+        return None
+
+    logging.info(f"Search input detected in DOM: {details['name']}")
+    return {"action": details["action"] or page.url, "params": [details["name"]]}
+
+async def analyze_pages(pages):
+    """Analyze several (url, html) pairs with a single LLM request.
+
+    Returns a list of analysis results in the same order as the input. Pages
+    already in the LLM cache are not re-sent. If the batched response can't be
+    parsed, each page is analyzed individually.
+    """
+    analyses = [llm_cache.get(cache_key(html)) for _, html in pages]
+    pending = [i for i, analysis in enumerate(analyses) if analysis is None]
+    if len(pending) < len(pages):
+        logging.info(f"Using cached analysis for {len(pages) - len(pending)} of {len(pages)} pages")
+    if len(pending) <= 1:
+        for i in pending:
+            analyses[i] = await analyze_page(*pages[i])
+        return analyses
+    pending_pages = [pages[i] for i in pending]
+
+    page_blocks = []
+    for page_id, (url, html) in enumerate(pending_pages):
+        page_blocks.append(f"<<<PAGE id={page_id} url={url}>>>\n{html[:HTML_SNIPPET_LENGTH]}\n<<<END>>>")
+
+    response_text = ""
+    try:
+        logging.info(f"Analyzing {len(pending_pages)} pages in one request: {', '.join(url for url, _ in pending_pages)}")
+        response_text = await request_analysis(
+            BATCH_PROMPT,
+            f"{len(pending_pages)} pages to analyze:\n" + "\n".join(page_blocks),
+            BATCH_ANALYSIS_SCHEMA,
+        )
+        batch_analyses = json_loads(response_text).get("pages")
+        if not isinstance(batch_analyses, list) or len(batch_analyses) != len(pending_pages):
+            raise ValueError(f"expected {len(pending_pages)} page results")
+
+        for i, analysis in zip(pending, batch_analyses):
+            analyses[i] = analysis
+            llm_cache[cache_key(pages[i][1])] = analysis
+        return analyses
+
+    except (json.JSONDecodeError, ValueError) as e:
+        logging.warning(f"Failed to parse batched LLM response ({e}), analyzing pages individually")
+        logging.debug(f"Raw LLM response (first 500 chars): {response_text[:500]}")
+    except Exception as e:
+        logging.warning(f"Batched analysis failed ({e}), analyzing pages individually")
+
+    for i in pending:
+        analyses[i] = await analyze_page(*pages[i])
+    return analyses
+
+async def wait_for_search_results(page):
+    """Wait until search results render or the network goes idle, whichever comes first."""
+    waiters = [
+        asyncio.create_task(page.wait_for_selector(SEARCH_RESULTS_SELECTOR, timeout=SEARCH_RESULTS_TIMEOUT)),
+        asyncio.create_task(page.wait_for_load_state("networkidle", timeout=SEARCH_RESULTS_TIMEOUT)),
+    ]
+    try:
+        for waiter in asyncio.as_completed(waiters):
+            try:
+                await waiter
+                return
+            except PlaywrightError:
+                continue
+        # Busy or unusual pages are still worth capturing as-is
+        logging.info("Search results did not settle before timeout, capturing anyway")
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+async def capture_search_results(page, search_form, results):
+    """Run a test search on the current page and return the results HTML, or None."""
+    global has_errors
+
+    try:
+        # Fill search box and submit
+        param_name = search_form["params"][0]
+        selector = f'input[name="{param_name}"]'
+        logging.info(f"Looking for search input with selector: {selector}")
+        if await page.locator(selector).count() == 0:
+            logging.warning(f"No search input found with selector: {selector}")
+            return None
+
+        logging.info(f"Found search input, filling with: {SEARCH_TEST_QUERY}")
+        await page.fill(selector, SEARCH_TEST_QUERY)
+
+        # Wait for navigation to start, then complete
+        async with page.expect_navigation(wait_until="domcontentloaded", timeout=30000):
+            await page.keyboard.press("Enter")
+
+        await wait_for_search_results(page)
+
+        try:
+            return await page.content()
+        except Exception as content_error:
+            logging.error(f"Failed to get search results content: {content_error}")
+            # Try one more time once the page has finished loading
+            try:
+                await page.wait_for_load_state("load", timeout=SEARCH_RESULTS_TIMEOUT)
+            except PlaywrightTimeoutError:
+                pass
+            try:
+                return await page.content()
+            except Exception as retry_error:
+                logging.error(f"Retry failed: {retry_error}")
+                has_errors = True
+                results["search_test_results"] = {"error": f"Failed to capture search results: {str(retry_error)}"}
+    except Exception as e:
+        logging.error(f"Error during search form interaction: {e}")
+        logging.error(f"Search form details: {search_form}")
+        has_errors = True
+        results["search_test_results"] = {"error": str(e)}
+    return None
+
+async def crawl_site(base_url, browser, semaphore, results):
+    """Capture the base page and, if it has a search form, its search results.
+
+    Returns (html, search_form, search_html). The search form normally comes
+    from the DOM query; only when that finds nothing is the base page sent to
+    the LLM, while the page stays open so a form it spots can be tested there.
+    """
+    # A slot covers this site's whole browser session, including the fallback LLM
+    # call below; the batched analysis in analyze_site() runs after it's released
+    async with semaphore:
+        context = await browser.new_context()
+        try:
+            await context.route("**/*", block_unneeded_requests)
+            page = await context.new_page()
+
+            # Visit base page
+            await page.goto(base_url, wait_until="domcontentloaded")
+            html = extract_interactive_html(prune_html(await page.content()))
 
-    # Visit base page
-    page.goto(BASE_URL)
-    html = page.content()
-    analysis = analyze_page(BASE_URL, html)
-    results["pages"][BASE_URL] = analysis
+            search_form = await detect_search_form_dom(page)
+            if search_form is None:
+                # Keep the context (and its browser slot) open during this fallback LLM
+                # call: reopening afterwards would cost a second page load, and the
+                # reloaded page could differ from the one the LLM analyzed
+                search_form = (await analyze_page(base_url, html)).get("search_form")
 
-    # If search form detected, run a test search
-    if analysis.get("search_form"):
+            search_html = None
+            if search_form:
+                search_html = await capture_search_results(page, search_form, results)
+                if search_html is not None:
+                    search_html = extract_interactive_html(prune_html(search_html))
+        finally:
+            await context.close()
+
+    return html, search_form, search_html
+
+async def analyze_site(base_url, browser, semaphore):
+    """Crawl and analyze a single site."""
+    results = {
+        "pages": {},
+        "search_detected": False,
+        "search_details": None,
+        "search_test_results": None
+    }
+
+    # Capture the pages first so they can go to the LLM in one batched request
+    html, search_form, search_html = await crawl_site(base_url, browser, semaphore, results)
+    if search_form:
         results["search_detected"] = True
-        results["search_details"] = analysis["search_form"]
+        results["search_details"] = search_form
+
+    # Base page and search results (if any) go to the LLM in a single request;
+    # a base page already analyzed while crawling is served from the LLM cache
+    pages = [(base_url, html)]
+    if search_html is not None:
+        pages.append((base_url + " (search results)", search_html))
+    analyses = await analyze_pages(pages)
+    analysis = analyses[0]
+    if search_html is not None:
+        results["search_test_results"] = analyses[1]
+
+    results["pages"][base_url] = analysis
+    return results
+
+def save_results(base_url, results):
+    """Save a site's analysis results to the sites folder."""
+    os.makedirs(SITES_DIR, exist_ok=True)
+
+    filename = get_safe_filename(base_url)
+    output_path = os.path.join(SITES_DIR, filename)
 
+    write_json_file(output_path, results, indent=True)
+
+    logging.info(f"Results saved to: {output_path}")
+
+async def run_site(base_url, browser, semaphore):
+    """Analyze one site and save its results, recording any failure."""
+    global has_errors
+
+    try:
+        results = await analyze_site(base_url, browser, semaphore)
+    except Exception as e:
+        logging.error(f"Failed to analyze {base_url}: {e}")
+        has_errors = True
+        return
+    save_results(base_url, results)
+
+async def main(urls):
+    async with async_playwright() as p, shared_llm_connections():
+        # Launch Chromium once and give each site a cheap, isolated context
+        browser = await p.chromium.launch()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SITES)
         try:
-            # Fill search box and submit
-            param_name = analysis["search_form"]["params"][0]
-            selector = f'input[name="{param_name}"]'
-            logging.info(f"Looking for search input with selector: {selector}")
-            if page.locator(selector).count() > 0:
-                logging.info(f"Found search input, filling with: {SEARCH_TEST_QUERY}")
-                page.fill(selector, SEARCH_TEST_QUERY)
-                
-                # Wait for navigation to start, then complete
-                with page.expect_navigation(timeout=30000):
-                    page.keyboard.press("Enter")
-                
-                # Additional wait to ensure page is fully loaded
-                page.wait_for_load_state("domcontentloaded")
-                page.wait_for_timeout(2000)  # Wait 2 seconds for any dynamic content
-                
-                try:
-                    search_html = page.content()
-                    search_analysis = analyze_page(BASE_URL + " (search results)", search_html)
-                    results["search_test_results"] = search_analysis
-                except Exception as content_error:
-                    logging.error(f"Failed to get search results content: {content_error}")
-                    # Try one more time after a longer wait
-                    page.wait_for_timeout(3000)
-                    try:
-                        search_html = page.content()
-                        search_analysis = analyze_page(BASE_URL + " (search results)", search_html)
-                        results["search_test_results"] = search_analysis
-                    except Exception as retry_error:
-                        logging.error(f"Retry failed: {retry_error}")
-                        has_errors = True
-                        results["search_test_results"] = {"error": f"Failed to capture search results: {str(retry_error)}"}
-            else:
-                logging.warning(f"No search input found with selector: {selector}")
-        except Exception as e:
-            logging.error(f"Error during search form interaction: {e}")
-            logging.error(f"Search form details: {analysis.get('search_form')}")
-            has_errors = True
-            results["search_test_results"] = {"error": str(e)}
-
-    browser.close()
-
-# Save results to sites folder
-sites_dir = "sites"
-os.makedirs(sites_dir, exist_ok=True)
-
-filename = get_safe_filename(BASE_URL)
-output_path = os.path.join(sites_dir, filename)
-
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(results, f, indent=2)
-
-logging.info(f"Results saved to: {output_path}")
-
-# Exit with error code if any errors occurred
-if has_errors:
-    logging.error("Script completed with errors")
-    sys.exit(1)
-else:
-    logging.info("Script completed successfully")
-    sys.exit(0)
+            await asyncio.gather(*(run_site(base_url, browser, semaphore) for base_url in urls))
+        finally:
+            await browser.close()
+
+    save_llm_cache()
+
+if __name__ == "__main__":
+    # Sites come from the command line, or one per line on stdin
+    urls = sys.argv[1:] or [line.strip() for line in sys.stdin if line.strip()]
+    if not urls:
+        sys.exit(f"Usage: {sys.argv[0]} URL [URL ...]")
+    if uvloop is not None:
+        uvloop.run(main(urls))
+    else:
+        asyncio.run(main(urls))
+
+    # Exit with error code if any errors occurred
+    if has_errors:
+        logging.error("Script completed with errors")
+        sys.exit(1)
+    else:
+        logging.info("Script completed successfully")
+        sys.exit(0)